@@ -6,13 +6,21 @@ if sys.stdout.encoding != 'utf-8':
 if sys.stderr.encoding != 'utf-8':
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 
+import asyncio
+import functools
+import hashlib
 import json
 import os
+import signal
+import threading
 import time
 import requests
 import traceback
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+from urllib3.util.retry import Retry
+from collections import deque
 from pathlib import Path
-from datetime import datetime
 
 # 尝试加载 .env 文件（如果存在）
 try:
@@ -21,11 +29,24 @@ try:
 except ImportError:
     pass  # 如果没有安装 python-dotenv，忽略
 
+# 尝试使用 orjson 加速 JSON 编解码（如果已安装），否则回退到标准库 json
+try:
+    import orjson
+
+    json_loads = orjson.loads
+    json_dumps = functools.partial(orjson.dumps, option=orjson.OPT_SORT_KEYS)
+except ImportError:
+    json_loads = json.loads
+
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
 
 # ================== 配置区域 ==================
 
@@ -33,56 +54,120 @@ PUBLISH_URL = "https://mp.toutiao.com/profile_v4/weitoutiao/publish"
 LIST_URL = "https://mp.toutiao.com/profile_v4/weitoutiao"
 
 COOKIE_FILE = "toutiao_cookies.json"
-LAST_PUBLISHED_FILE = "last_published_id.txt"
+CHROME_PROFILE_DIR = "chrome-profile"  # Chrome 用户数据目录，浏览器自行持久化登录状态
+LAST_PUBLISHED_FILE = "last_published_id.txt"  # 每行一个已发布的内容 ID
+PUBLISHED_IDS_MAX = 10_000  # 内存中最多保留的已发布 ID 数量
+
+# 微头条发布接口（可选，从环境变量读取）
+# 在浏览器开发者工具中抓取发布时的 XHR 请求地址填入，配置后优先直接 POST 发布，失败时回退到浏览器发布
+PUBLISH_API_URL = os.getenv("PUBLISH_API_URL", "")
+PUBLISH_API_CONTENT_FIELD = os.getenv("PUBLISH_API_CONTENT_FIELD", "content")
 
 # 新闻 API 配置（从环境变量读取）
 NEWS_API_URL = os.getenv("NEWS_API_URL", "")
 NEWS_API_PARAMS_JSON = os.getenv("NEWS_API_PARAMS", "{}")
 try:
-    NEWS_PARAMS = json.loads(NEWS_API_PARAMS_JSON) if NEWS_API_PARAMS_JSON else {}
+    NEWS_PARAMS = json_loads(NEWS_API_PARAMS_JSON) if NEWS_API_PARAMS_JSON else {}
 except json.JSONDecodeError:
     NEWS_PARAMS = {}
 
+# 常用 limit 的请求参数在启动时构建一次，轮询时直接复用
+_PARAMS_LIMIT10 = {**NEWS_PARAMS, "limit": 10}
+_PARAMS_LIMIT1 = {**NEWS_PARAMS, "limit": 1}
+
+DEBUG = os.getenv("DEBUG", "").lower() in ("1", "true", "yes")  # 输出每次轮询的详细调试日志
 HEADLESS = False  # 保持非 headless 模式，避免被封禁风险
-FETCH_INTERVAL_SEC = 60          
+FETCH_INTERVAL_SEC = 60          # 初始轮询间隔（秒），运行中会自适应调整
+FETCH_INTERVAL_MIN_SEC = 15      # 有新内容发布后，间隔减半但不低于该值
+FETCH_INTERVAL_MAX_SEC = 300     # 连续无新内容时，间隔逐步增大但不超过该值
 WAIT_SEC = 25     
+WAIT_POLL_SEC = 0.25             # 显式等待的轮询间隔（秒），默认 0.5 秒偏慢
+BROWSER_IDLE_POLLS = 3           # 连续多少次轮询无新内容后关闭浏览器释放内存
+
+# 发布页中与编辑器交互无关的子资源（图片、字体、统计脚本），登录后通过 CDP 屏蔽以加快页面加载
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp",
+    "*.woff*", "*.ttf",
+    "*google-analytics*", "*sentry*",
+]
 
 # ================== 工具函数 ==================
 
 def log(step: str, msg: str):
-    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [{step}] {msg}", flush=True)
+    print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] [{step}] {msg}", flush=True)
 
 def err(step: str, msg: str):
-    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [ERROR:{step}] {msg}", flush=True)
+    print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] [ERROR:{step}] {msg}", flush=True)
 
 # ================== Cookie 管理 ==================
 
+# 头条登录态相关的 Cookie 名称，任一存在即认为可能处于登录状态
+_SESSION_COOKIE_NAMES = {"sessionid", "sessionid_ss", "sso_uid_tt"}
+
+# 最近一次读取/写入的 Cookie 内容摘要，内容未变化时跳过写文件
+_last_cookies_digest = b""
+
+def _cookies_digest(cookies: list[dict]) -> bytes:
+    return hashlib.blake2b(json_dumps(cookies)).digest()
+
+def _add_cookies(driver, cookies: list[dict]):
+    """通过一次 CDP 调用批量注入 Cookie，失败时回退到逐条 add_cookie"""
+    try:
+        params = []
+        for c in cookies:
+            p = {k: v for k, v in c.items() if k != "expiry"}
+            if "expiry" in c:
+                p["expires"] = c["expiry"]
+            if not p.get("domain"):
+                p["url"] = "https://mp.toutiao.com"
+            params.append(p)
+        driver.execute_cdp_cmd("Network.setCookies", {"cookies": params})
+        return
+    except Exception as e:
+        log("cookie", f"批量注入 Cookie 失败，逐条注入: {type(e).__name__}")
+
+    for c in cookies:
+        try:
+            driver.add_cookie(c)
+        except:
+            pass
+
+def _is_logged_in(driver) -> bool:
+    """打开发布页，以编辑器出现（已登录）或跳转到登录页（未登录，包括前端 JS 跳转）中先发生者为准"""
+    driver.get(PUBLISH_URL)
+    try:
+        WebDriverWait(driver, WAIT_SEC, poll_frequency=WAIT_POLL_SEC).until(
+            lambda d: "login" in d.current_url.lower() or d.find_elements(*_EDITOR_LOC)
+        )
+    except TimeoutException:
+        return False
+    return "login" not in driver.current_url.lower()
+
 def load_cookies(driver) -> bool:
     """注入本地 Cookie 并验证有效性"""
     if not Path(COOKIE_FILE).exists():
         return False
 
+    global _last_cookies_digest
+
     try:
-        with open(COOKIE_FILE, "r", encoding="utf-8") as f:
-            cookies = json.load(f)
+        cookies = json_loads(Path(COOKIE_FILE).read_bytes())
+        _last_cookies_digest = _cookies_digest(cookies)
         
-        # 必须先访问域名才能注入 Cookie
+        # 必须先访问域名才能注入 Cookie（get 会等待页面加载完成，无需额外等待）
         driver.get("https://mp.toutiao.com")
-        time.sleep(2)
         
-        for c in cookies:
-            try:
-                driver.add_cookie(c)
-            except:
-                pass
+        _add_cookies(driver, cookies)
         
-        log("cookie", "已注入本地 Cookie，尝试刷新验证...")
-        driver.refresh()
-        time.sleep(3)
+        # 没有登录态 Cookie 时无需验证
+        names = {c.get("name") for c in driver.get_cookies()}
+        if not names & _SESSION_COOKIE_NAMES:
+            log("cookie", "本地 Cookie 中没有登录态，需要重新登录")
+            return False
 
-        # 验证是否进入了登录后的页面（通过判断是否存在发布按钮或特定 ID）
-        # 如果依然停留在登录页，说明 Cookie 失效
-        if "login" in driver.current_url.lower():
+        # 直接打开发布页验证登录态：编辑器出现即有效，无需刷新后固定等待
+        log("cookie", "已注入本地 Cookie，尝试验证...")
+        if not _is_logged_in(driver):
             log("cookie", "Cookie 已失效，需要重新登录")
             return False
             
@@ -93,13 +178,105 @@ def load_cookies(driver) -> bool:
         return False
 
 def save_cookies(driver):
+    """保存 Cookie 到本地：内容未变化时跳过，写入临时文件后原子替换，避免中途崩溃导致文件损坏"""
+    global _last_cookies_digest
+
+    if not _last_cookies_digest and Path(COOKIE_FILE).exists():
+        # 本次运行还未读取过 Cookie 文件时，以文件现有内容为比较基准
+        try:
+            _last_cookies_digest = _cookies_digest(json_loads(Path(COOKIE_FILE).read_bytes()))
+        except Exception:
+            pass
+
     cookies = driver.get_cookies()
-    with open(COOKIE_FILE, "w", encoding="utf-8") as f:
-        json.dump(cookies, f, ensure_ascii=False, indent=2)
+    content = json_dumps(cookies)
+    digest = hashlib.blake2b(content).digest()
+    if digest == _last_cookies_digest:
+        log("cookie", "Cookie 未变化，无需保存")
+        return
+
+    tmp_file = COOKIE_FILE + ".tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(content)
+    os.replace(tmp_file, COOKIE_FILE)
+    _last_cookies_digest = digest
     log("cookie", "Cookie 已保存到本地")
 
+# ================== 发布记录 ==================
+
+# 已发布 ID 集合（用于 O(1) 去重）及其发布顺序（用于超出上限时淘汰最旧的 ID）
+_published_ids: set[str] = set()
+_published_order: deque = deque()
+
+def load_published_ids() -> set[str]:
+    """读取已发布 ID 记录（每行一个，兼容旧版只保存单个 ID 的文件），文件超出上限时压缩为最近的记录"""
+    _published_ids.clear()
+    _published_order.clear()
+    path = Path(LAST_PUBLISHED_FILE)
+    if not path.exists():
+        return _published_ids
+
+    raw = path.read_text(encoding="utf-8")
+    lines = raw.splitlines()
+    for line in lines[-PUBLISHED_IDS_MAX:]:
+        c_id = line.strip()
+        if c_id and c_id not in _published_ids:
+            _published_ids.add(c_id)
+            _published_order.append(c_id)
+
+    if len(lines) > PUBLISHED_IDS_MAX:
+        # 只保留最近的记录，写入临时文件后原子替换
+        tmp_file = LAST_PUBLISHED_FILE + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            f.writelines(f"{c_id}\n" for c_id in _published_order)
+        os.replace(tmp_file, path)
+    elif raw and not raw.endswith("\n"):
+        # 旧版文件末尾没有换行，补上以便后续直接追加
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("\n")
+    return _published_ids
+
+def record_published_id(c_id: str):
+    """记录一个已发布 ID：加入内存集合（超出上限时淘汰最旧的）并追加写入文件"""
+    _published_ids.add(c_id)
+    _published_order.append(c_id)
+    while len(_published_order) > PUBLISHED_IDS_MAX:
+        _published_ids.discard(_published_order.popleft())
+    with open(LAST_PUBLISHED_FILE, "a", encoding="utf-8") as f:
+        f.write(f"{c_id}\n")
+
+# ================== 浏览器工具 ==================
+
+def block_heavy_resources(driver):
+    """通过 CDP 屏蔽图片、字体和统计脚本，减少发布页加载时间"""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+        log("boot", "已屏蔽图片/字体等非必要资源")
+    except Exception as e:
+        err("boot", f"屏蔽资源失败，继续使用完整页面: {repr(e)}")
+
 # ================== API 获取逻辑 ==================
 
+# 复用同一个 Session（HTTP keep-alive），避免每次轮询都重新建立 TCP+TLS 连接
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=1,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504]),
+)
+_SESSION.mount("https://", _ADAPTER)
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.headers.update({
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "application/json",
+})
+
+# 上一次 API 响应的缓存：响应未变化时直接复用已解析、已过滤的结果
+_last_etag = ""
+_last_hash = b""
+_last_valid_items: list[dict] = []
+
 def get_latest_news_list(limit: int = 10) -> list[dict]:
     """从配置的 API 获取最新新闻列表（支持批量获取，避免丢失新闻）
     
@@ -109,49 +286,69 @@ def get_latest_news_list(limit: int = 10) -> list[dict]:
     Returns:
         有中文内容的新闻列表，按时间倒序排列
     """
+    global _last_etag, _last_hash, _last_valid_items
+
     if not NEWS_API_URL:
         err("api", "未配置 NEWS_API_URL 环境变量")
         return []
     
-    # 临时修改 limit 参数，获取多条新闻
-    params = NEWS_PARAMS.copy()
-    params["limit"] = limit
+    # 按 limit 选择预构建的参数，其他 limit 才临时构建
+    if limit == 10:
+        params = _PARAMS_LIMIT10
+    elif limit == 1:
+        params = _PARAMS_LIMIT1
+    else:
+        params = {**NEWS_PARAMS, "limit": limit}
     
-    # 调试日志：输出配置信息
-    log("api", f"API URL: {NEWS_API_URL}")
-    log("api", f"API 参数: {params}")
+    # 调试日志：输出配置信息（每次轮询都会执行，默认关闭）
+    if DEBUG:
+        log("api", f"API URL: {NEWS_API_URL}")
+        log("api", f"API 参数: {params}")
     
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Accept": "application/json"
-    }
+    # 通用请求头已设置在 _SESSION 上；服务器支持 ETag 时走条件请求，未变化会直接返回 304
+    headers = {"If-None-Match": _last_etag} if _last_etag else None
     try:
-        resp = requests.get(NEWS_API_URL, params=params, headers=headers, timeout=20, verify=True)
+        resp = _SESSION.get(NEWS_API_URL, params=params, headers=headers, timeout=20, verify=True, stream=False)
+        if resp.status_code == 304:
+            log("api", "API 返回 304，内容未变化，复用缓存结果")
+            return _last_valid_items
         resp.raise_for_status()
-        data = resp.json()
+
+        # 响应体与上次完全相同时跳过 JSON 解析和过滤
+        content_hash = hashlib.blake2b(resp.content).digest()
+        if content_hash == _last_hash:
+            log("api", "API 响应未变化，复用缓存结果")
+            return _last_valid_items
+
+        data = json_loads(resp.content)
         items = data.get("items", [])
         
         if items:
             log("api", f"获取到 {len(items)} 条新闻")
             # 检查每条新闻是否有中文内容，过滤出有效的新闻
-            valid_items = []
-            for news in items:
-                has_zh = news.get("content_multilingual", {}).get("zh") if isinstance(news.get("content_multilingual"), dict) else None
-                if has_zh and has_zh.get("title") and has_zh.get("summary"):
-                    log("api", f"找到中文内容: {has_zh.get('title', '')[:50]}...")
-                    valid_items.append(news)
-                else:
-                    log("api", f"跳过无中文内容的新闻: {news.get('id', 'unknown')}")
+            valid_items = [
+                n for n in items
+                if isinstance(cm := n.get("content_multilingual"), dict)
+                and (z := cm.get("zh")) and z.get("title") and z.get("summary")
+            ]
+            if DEBUG:
+                valid_ids = {id(n) for n in valid_items}
+                for news in items:
+                    if id(news) not in valid_ids:
+                        log("api", f"跳过无中文内容的新闻: {news.get('id', 'unknown')}")
             
             if valid_items:
-                log("api", f"有效新闻数量: {len(valid_items)}")
+                log("api", f"有效新闻数量: {len(valid_items)}（跳过无中文内容 {len(items) - len(valid_items)} 条）")
             else:
                 log("api", "警告：所有新闻都没有中文内容")
-            
-            return valid_items
         else:
             log("api", "API 返回的 items 为空")
-            return []
+            valid_items = []
+
+        _last_etag = resp.headers.get("ETag", "")
+        _last_hash = content_hash
+        _last_valid_items = valid_items
+        return valid_items
     except Exception as e:
         err("api", f"获取新闻失败: {repr(e)}")
         import traceback
@@ -165,78 +362,86 @@ def get_latest_news() -> dict | None:
 
 # ================== 发布逻辑 ==================
 
+# 发布页元素定位器（发布按钮没有稳定的 class/data 属性，只能按文本匹配，保留 XPath）
+# 编辑器段落只在可编辑容器内查找，避免前端路由切换时匹配到列表页残留的 <p>
+_EDITOR_LOC = (By.CSS_SELECTOR, '#root [contenteditable] p,#root p[contenteditable]')
+_PUBLISH_BTN_LOC = (By.XPATH, '//*[@id="root"]//button[contains(.,"发布")]')
+_CLOSE_LOC = (By.CSS_SELECTOR, '[class*="close"],[aria-label*="关闭"]')
+
+# 当前浏览器会话中是否已确认发布页没有需要关闭的弹窗
+_saw_no_modal = False
+
+# 发布文本末尾固定追加的话题标签
+_TAGS = "\n\n#美股# #财经#"
+
 def extract_content_from_summary(summary) -> str:
     if isinstance(summary, list):
-        return "\n\n".join(str(x).strip() for x in summary if x).strip()
-    return str(summary or "").strip()
+        parts = [s.strip() for s in summary if isinstance(s, str) and s.strip()]
+        return "\n\n".join(parts)
+    return summary.strip() if isinstance(summary, str) else ""
 
-def publish_micro(driver, news: dict):
-    content_id = news.get("id")
-    
+def build_final_text(news: dict) -> str:
+    """根据新闻内容生成最终发布文本（优先使用中文内容）"""
     # 优先使用中文内容（content_multilingual.zh）
     content_multilingual = news.get("content_multilingual", {})
     zh_content = content_multilingual.get("zh") if isinstance(content_multilingual, dict) else None
     
     if zh_content and zh_content.get("title") and zh_content.get("summary"):
         # 使用中文内容
-        title = zh_content.get("title", "")
+        title = str(zh_content.get("title", ""))
         content = extract_content_from_summary(zh_content.get("summary"))
         log("publish", "使用中文内容")
     else:
         # 回退到英文内容
-        title = news.get("smart_title", "")
+        title = str(news.get("smart_title") or "")
         content = extract_content_from_summary(news.get("summary"))
         log("publish", "使用英文内容（未找到中文内容）")
     
-    final_text = f"【{title}】\n\n{content}\n\n#美股# #财经#"
-    
-    log("publish", f"正在发布 ID: {content_id}")
-    driver.get(PUBLISH_URL)
-    wait = WebDriverWait(driver, WAIT_SEC)
-    
+    return "".join(("【", title, "】\n\n", content, _TAGS))
+
+def _fill_and_submit(driver, wait, final_text: str) -> bool:
+    """在已加载的发布页中填写内容并点击发布，成功跳转到列表页返回 True"""
+    global _saw_no_modal
+
     try:
-        # 等待页面完全加载
-        time.sleep(2)
-        
         # 等待编辑器出现
-        editor = wait.until(EC.presence_of_element_located((By.XPATH, '//*[@id="root"]//p')))
+        editor = wait.until(EC.presence_of_element_located(_EDITOR_LOC))
         # 确保编辑器可见且可交互
-        wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="root"]//p')))
+        wait.until(EC.element_to_be_clickable(_EDITOR_LOC))
         
         # 清空编辑器并输入内容
         editor.clear()
         editor.send_keys(final_text)
         
-        # 等待内容输入完成，可能有验证逻辑
-        time.sleep(2)
-        
-        # 尝试关闭可能的弹窗或提示（如果有）
-        try:
-            close_elements = driver.find_elements(By.XPATH, "//*[contains(@class, 'close') or contains(@aria-label, '关闭') or contains(@class, 'modal-close')]")
-            for elem in close_elements[:3]:  # 只尝试前3个，避免过多尝试
-                try:
-                    if elem.is_displayed():
+        # 尝试关闭可能的弹窗或提示（如果有）；本次浏览器会话中已确认没有弹窗时跳过
+        if not _saw_no_modal:
+            try:
+                # 只检查前3个，避免过多尝试
+                displayed = [e for e in driver.find_elements(*_CLOSE_LOC)[:3] if e.is_displayed()]
+                for elem in displayed:
+                    try:
                         elem.click()
                         time.sleep(0.5)
-                except:
-                    pass
-        except:
-            pass
+                    except:
+                        pass
+                _saw_no_modal = not displayed
+            except:
+                pass
         
         # 等待发布按钮可点击，并滚动到可见位置
-        btn = wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="root"]//button[contains(., "发布")]')))
+        btn = wait.until(EC.element_to_be_clickable(_PUBLISH_BTN_LOC))
         
         # 滚动到按钮位置，确保在视口中
         driver.execute_script("arguments[0].scrollIntoView({block: 'center', behavior: 'auto'});", btn)
-        time.sleep(1)  # 等待滚动完成
-        
-        # 再次检查按钮是否可点击
-        btn = wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="root"]//button[contains(., "发布")]')))
         
         # 尝试多种点击方式
         try:
-            # 方法1: 普通点击
-            btn.click()
+            # 方法1: 普通点击（按钮在滚动后被重新渲染时，重新定位一次）
+            try:
+                btn.click()
+            except StaleElementReferenceException:
+                btn = wait.until(EC.element_to_be_clickable(_PUBLISH_BTN_LOC))
+                btn.click()
             log("publish", "使用普通点击方式")
         except Exception as click_error:
             log("publish", f"普通点击失败: {type(click_error).__name__}，尝试 JavaScript 点击")
@@ -253,26 +458,138 @@ def publish_micro(driver, news: dict):
         # 等待 URL 跳转到列表页，表示发布成功
         wait.until(EC.url_to_be(LIST_URL))
         log("publish", "发布成功，已跳转到列表页")
-        time.sleep(3) # 跳转后短暂等待页面加载
         return True
     except Exception as e:
         err("publish", f"发布过程出错: {repr(e)}")
+        # 发布失败可能是弹窗遮挡导致，下次重新检查弹窗
+        _saw_no_modal = False
         # 在 CI 环境中，尝试保存截图以便调试（如果配置了截图功能）
         if os.getenv("CI") == "true" or os.getenv("GITHUB_ACTIONS") == "true":
             try:
-                screenshot_path = f"error_screenshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
+                screenshot_path = f"error_screenshot_{time.strftime('%Y%m%d_%H%M%S')}.png"
                 driver.save_screenshot(screenshot_path)
                 log("publish", f"错误截图已保存: {screenshot_path}")
             except:
                 pass
         return False
 
+def _return_to_editor(driver, wait):
+    """发布成功后从列表页回到发布页：优先浏览器后退（前端路由，无需整页重载），失败再重新打开"""
+    try:
+        driver.back()
+        wait.until(EC.url_to_be(PUBLISH_URL))
+        # URL 变化后列表页 DOM 可能尚未卸载，等待编辑器本身出现
+        wait.until(EC.element_to_be_clickable(_EDITOR_LOC))
+    except Exception:
+        log("publish", "后退未回到发布页，重新打开发布页")
+        driver.get(PUBLISH_URL)
+
+def publish_batch(driver, news_items: list[dict], on_published=None, stop_event: threading.Event | None = None) -> int:
+    """在同一个发布页会话中依次发布多条新闻，只加载一次 PUBLISH_URL
+    
+    Args:
+        news_items: 待发布的新闻列表
+        on_published: 每条发布成功后的回调，参数为该条新闻
+        stop_event: 收到停止信号后，当前条目发布完成即停止，不再发布后续条目
+    
+    Returns:
+        成功发布的条数（遇到失败即停止处理后续新闻）
+    """
+    if not news_items:
+        return 0
+
+    wait = WebDriverWait(driver, WAIT_SEC, poll_frequency=WAIT_POLL_SEC)
+    driver.get(PUBLISH_URL)
+
+    published_count = 0
+    for i, news in enumerate(news_items):
+        if stop_event is not None and stop_event.is_set():
+            log("publish", "收到停止信号，剩余新闻留待下次运行发布")
+            break
+        if i > 0:
+            _return_to_editor(driver, wait)
+        final_text = build_final_text(news)
+        log("publish", f"正在发布 ID: {news.get('id')}")
+        if not _fill_and_submit(driver, wait, final_text):
+            break
+        published_count += 1
+        if on_published:
+            on_published(news)
+    return published_count
+
+def publish_micro(driver, news: dict) -> bool:
+    """发布单条新闻（兼容旧接口）"""
+    return publish_batch(driver, [news]) == 1
+
+def session_from_cookies(cookies: list[dict]) -> requests.Session:
+    """把登录 Cookie（浏览器导出或本地 Cookie 文件）复制到 requests.Session，用于直接调用发布接口"""
+    sess = requests.Session()
+    sess.headers.update({
+        "User-Agent": _SESSION.headers["User-Agent"],
+        "Accept": "application/json",
+        "Origin": "https://mp.toutiao.com",
+        "Referer": PUBLISH_URL,
+    })
+    for c in cookies:
+        sess.cookies.set(c["name"], c["value"], domain=c.get("domain"), path=c.get("path", "/"))
+    return sess
+
+def publish_micro_http(sess: requests.Session, news: dict) -> bool | None:
+    """直接 POST 到发布接口发布单条新闻（不经过浏览器）
+    
+    Returns:
+        True 表示发布成功；
+        None 表示登录态无效或请求未能发出，可以安全地回退到浏览器发布；
+        False 表示结果不确定（超时、5xx、响应无法识别等），请求可能已被接受，
+        调用方不应记录该条，也不应在本轮用浏览器重发，以免重复发布
+    """
+    final_text = build_final_text(news)
+    log("publish", f"正在通过接口发布 ID: {news.get('id')}")
+    try:
+        # 不跟随重定向：登录态失效时接口会被重定向到登录页，跟随后会得到 200 的 HTML 页面
+        resp = sess.post(PUBLISH_API_URL, data={PUBLISH_API_CONTENT_FIELD: final_text}, timeout=20, allow_redirects=False)
+        if resp.status_code in (401, 403) or resp.is_redirect:
+            log("publish", f"接口返回 {resp.status_code}，登录态无效，回退到浏览器发布")
+            return None
+        resp.raise_for_status()
+        try:
+            data = resp.json()
+        except ValueError:
+            log("publish", "接口返回的不是 JSON，无法确认是否发布成功")
+            return False
+        # 头条接口以 code / err_no 为 0 表示成功，缺少这两个字段视为失败
+        code = None
+        if isinstance(data, dict):
+            code = data.get("code", data.get("err_no"))
+        if code not in (0, "0"):
+            message = (data.get("message") or data.get("err_tips")) if isinstance(data, dict) else None
+            log("publish", f"接口返回错误: {message or code}")
+            return False
+        log("publish", "接口发布成功")
+        return True
+    except requests.ConnectTimeout as e:
+        err("publish", f"连接发布接口超时，回退到浏览器发布: {repr(e)}")
+        return None
+    except requests.ConnectionError as e:
+        # 只有建立连接失败（DNS 解析、拒绝连接等）时才能确定请求没有发出
+        reason = getattr(e.args[0], "reason", None) if e.args else None
+        if isinstance(reason, NewConnectionError):
+            err("publish", f"无法连接发布接口，回退到浏览器发布: {repr(e)}")
+            return None
+        err("publish", f"接口发布出错，无法确认是否发布成功: {repr(e)}")
+        return False
+    except Exception as e:
+        err("publish", f"接口发布出错，无法确认是否发布成功: {repr(e)}")
+        return False
+
 # ================== 主逻辑 ==================
 
-def main():
-    log("boot", "程序启动...")
-    last_file = Path(LAST_PUBLISHED_FILE)
-    last_id = last_file.read_text().strip() if last_file.exists() else ""
+def launch_browser(stop_event: threading.Event | None = None):
+    """启动 Chrome，完成 Cookie 复用或人工登录，返回可用于发布的 driver
+    
+    等待人工登录期间收到 stop_event 停止信号时关闭浏览器并返回 None
+    """
+    global _saw_no_modal
 
     chrome_options = Options()
     # 保持非 headless 模式，避免被封禁风险
@@ -287,6 +604,12 @@ def main():
         chrome_options.add_argument("--disable-dev-shm-usage")
         # 注意：在 Windows CI 环境中，非 headless 模式也能正常运行
     
+    # 使用固定的用户数据目录，登录状态由 Chrome 自己保存，下次启动无需注入 Cookie
+    chrome_options.add_argument(f"--user-data-dir={os.path.abspath(CHROME_PROFILE_DIR)}")
+    
+    log("boot", "启动浏览器...")
+    # 新的浏览器会话可能再次出现弹窗，需要重新检查
+    _saw_no_modal = False
     driver = webdriver.Chrome(options=chrome_options)
     # 显式设置窗口大小，确保元素可见
     try:
@@ -299,57 +622,226 @@ def main():
             pass
 
     try:
-        # 1. Cookie 优先复用逻辑
-        if not load_cookies(driver):
+        # 优先复用浏览器用户数据目录中的登录状态，其次注入本地 Cookie 文件
+        # 用户数据中没有登录态 Cookie（如 CI 中的全新目录）时直接注入 Cookie 文件，不必打开页面验证
+        try:
+            profile_cookies = driver.execute_cdp_cmd("Network.getAllCookies", {}).get("cookies", [])
+        except Exception:
+            profile_cookies = []
+        has_session = {c.get("name") for c in profile_cookies} & _SESSION_COOKIE_NAMES
+        if has_session and _is_logged_in(driver):
+            log("cookie", "浏览器用户数据中已有有效登录状态，无需注入 Cookie")
+            # 同步最新 Cookie 到本地文件，供接口发布和 CI 使用
+            save_cookies(driver)
+        elif not load_cookies(driver):
             log("login", "未检测到有效 Cookie，请在弹出的浏览器中完成登录...")
             driver.get("https://mp.toutiao.com")
             # 循环检查直到用户登录成功（URL 不再包含 login）
             while "login" in driver.current_url.lower():
-                time.sleep(2)
+                if stop_event is None:
+                    time.sleep(2)
+                elif stop_event.wait(2):
+                    log("login", "收到停止信号，放弃等待登录")
+                    driver.quit()
+                    return None
             save_cookies(driver)
             log("login", "登录成功，Cookie 已记录")
 
-        # 2. 轮询主循环（支持批量处理，避免丢失新闻）
-        # 根据实际情况：10分钟内最多十几条，所以每次获取10条足够覆盖
+        # 登录完成后再屏蔽资源，避免影响登录页的二维码/验证码图片
+        block_heavy_resources(driver)
+    except BaseException:
+        driver.quit()
+        raise
+    return driver
+
+# 发布队列中的控制标记：通知发布任务关闭空闲的浏览器
+_RELEASE_BROWSER = object()
+
+async def poll_news(queue: asyncio.Queue, results: asyncio.Queue, published_ids: set[str], queued_ids: set[str], stop_event: threading.Event):
+    """轮询任务：定时拉取新闻，把未发布的新内容按批放入发布队列，收到停止信号后放入 None 结束发布任务
+    
+    results 中是发布任务回报的每批成功发布条数，用于调整轮询间隔
+    """
+    # 根据实际情况：10分钟内最多十几条，所以每次获取10条足够覆盖
+    interval = FETCH_INTERVAL_SEC
+    idle_polls = 0
+    try:
         while True:
-            # 获取多条新闻（最多10条），避免在发布过程中丢失新新闻
-            news_list = get_latest_news_list(limit=10)
-            
-            if news_list:
-                published_count = 0
-                for news in news_list:
-                    c_id = news.get("id")
-                    if c_id != last_id:
-                        log("main", f"检测到新内容: {c_id}")
-                        if publish_micro(driver, news):
-                            last_id = c_id
-                            last_file.write_text(c_id)
-                            published_count += 1
-                            log("main", f"发布成功，已更新本地 ID（本次已发布 {published_count} 条）")
-                        else:
-                            log("main", f"发布失败，停止处理后续新闻，等待下次轮询")
-                            break  # 如果发布失败，停止处理后续新闻，等待下次轮询
-                    else:
-                        # 已发布过，跳过
-                        log("main", f"新闻 {c_id} 已发布过，跳过")
-                
-                if published_count == 0:
-                    # 视觉反馈：显示当前时间，证明程序没死
-                    print(f"\r[{datetime.now().strftime('%H:%M:%S')}] 暂无新内容，等待中...", end="", flush=True)
+            # 获取多条新闻（最多10条），在线程中执行，不阻塞正在进行的发布
+            news_list = await asyncio.to_thread(get_latest_news_list, 10)
+            # 过滤掉已发布和已在队列中等待发布的新闻
+            new_items = [
+                news for news in news_list
+                if news.get("id") not in published_ids and news.get("id") not in queued_ids
+            ]
+
+            for news in new_items:
+                log("main", f"检测到新内容: {news.get('id')}")
+                queued_ids.add(news.get("id"))
+            if new_items:
+                queue.put_nowait(new_items)
+
+            # 汇总上次轮询以来发布任务完成的批次
+            finished_batches = 0
+            published_count = 0
+            while not results.empty():
+                published_count += results.get_nowait()
+                finished_batches += 1
+
+            # 队列中还有待发布/发布中的新闻时不算空闲
+            if queued_ids or published_count > 0:
+                idle_polls = 0
             else:
                 # 视觉反馈：显示当前时间，证明程序没死
-                print(f"\r[{datetime.now().strftime('%H:%M:%S')}] 暂无新内容，等待中...", end="", flush=True)
-            
-            # 倒计时等待，允许 Ctrl+C 退出
-            for i in range(FETCH_INTERVAL_SEC, 0, -1):
-                time.sleep(1)
-                
+                print(f"\r[{time.strftime('%H:%M:%S')}] 暂无新内容，等待中...", end="", flush=True)
+                idle_polls += 1
+                # 连续多次无新内容时通知关闭浏览器释放内存
+                if idle_polls == BROWSER_IDLE_POLLS:
+                    queue.put_nowait(_RELEASE_BROWSER)
+
+            # 自适应轮询间隔：成功发布后加快；空闲或发布失败时逐步放慢；发布进行中保持不变
+            if published_count > 0:
+                interval = max(FETCH_INTERVAL_MIN_SEC, interval // 2)
+            elif finished_batches or not queued_ids:
+                interval = min(FETCH_INTERVAL_MAX_SEC, int(interval * 1.3))
+
+            # 等待到下次轮询，允许 Ctrl+C 退出
+            if stop_event.is_set() or await asyncio.to_thread(stop_event.wait, interval):
+                log("exit", "用户手动停止程序")
+                break
+    finally:
+        queue.put_nowait(None)
+
+def main():
+    log("boot", "程序启动...")
+
+    # Ctrl+C 只设置停止标志：正在发布的条目完成后退出，等待人工登录则立即中止；
+    # 再次按下会中断事件循环，但仍需等待正在进行的这一条浏览器发布结束
+    stop_event = threading.Event()
+
+    def on_sigint(signum, frame):
+        if stop_event.is_set():
+            raise KeyboardInterrupt
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, on_sigint)
+    published_ids = load_published_ids()
+    log("boot", f"已加载 {len(published_ids)} 条发布记录")
+
+    # 浏览器按需启动：只有真正需要浏览器发布时才启动，空闲一段时间后释放
+    driver = None
+    publish_sess = None
+
+    # 配置了发布接口时，直接用本地 Cookie 文件构建会话，无需先启动浏览器
+    if PUBLISH_API_URL and Path(COOKIE_FILE).exists():
+        try:
+            publish_sess = session_from_cookies(json_loads(Path(COOKIE_FILE).read_bytes()))
+        except Exception as e:
+            err("boot", f"读取 Cookie 文件失败，将在启动浏览器后重试: {repr(e)}")
+
+    def ensure_driver():
+        nonlocal driver, publish_sess
+        if driver is None:
+            driver = launch_browser(stop_event)
+            # 配置了发布接口时，复用浏览器登录态走 HTTP 快速发布
+            if driver is not None and PUBLISH_API_URL:
+                publish_sess = session_from_cookies(driver.get_cookies())
+        elif PUBLISH_API_URL and publish_sess is None:
+            # 接口登录态失效后，用浏览器中最新的 Cookie 重建会话
+            publish_sess = session_from_cookies(driver.get_cookies())
+        return driver
+
+    def release_driver(reason: str):
+        # Cookie 已保存在本地，下次启动无需重新登录
+        nonlocal driver
+        if driver is not None:
+            log("main", f"{reason}，关闭浏览器释放资源")
+            try:
+                driver.quit()
+            except Exception as e:
+                err("main", f"关闭浏览器出错: {repr(e)}")
+            driver = None
+
+    def on_published(news: dict):
+        record_published_id(news.get("id"))
+        log("main", f"发布成功，已记录本地 ID: {news.get('id')}")
+
+    def publish_pending(pending: list[dict]) -> int:
+        """发布一批新闻，优先走接口发布；接口登录态无效或请求未发出时，剩余条目回退到浏览器发布"""
+        nonlocal publish_sess
+        published_count = 0
+        if stop_event.is_set():
+            return published_count
+        if publish_sess is not None:
+            for news in pending:
+                result = publish_micro_http(publish_sess, news)
+                if result is None:
+                    # 登录态失效的会话不再重试，下次启用浏览器时重建
+                    publish_sess = None
+                    break
+                if not result:
+                    # 结果不确定，本轮不再用浏览器重发，等待下次轮询
+                    log("main", f"发布失败，停止处理后续新闻，等待下次轮询")
+                    return published_count
+                on_published(news)
+                published_count += 1
+
+        browser_pending = pending[published_count:]
+        if browser_pending:
+            # 浏览器启动或发布过程中的异常不能中断主循环，未发布的条目下次轮询重试
+            try:
+                browser = ensure_driver()
+                if browser is not None:
+                    published_count += publish_batch(browser, browser_pending, on_published=on_published, stop_event=stop_event)
+            except Exception as e:
+                err("main", f"浏览器发布出错，下次轮询重试: {repr(e)}")
+                release_driver("浏览器可能已不可用")
+        if published_count < len(pending) and not stop_event.is_set():
+            log("main", f"发布失败，停止处理后续新闻，等待下次轮询")
+        return published_count
+
+    async def publish_worker(queue: asyncio.Queue, results: asyncio.Queue, queued_ids: set[str]):
+        """发布任务：依次取出队列中的新闻批次，在线程中执行发布，期间轮询任务照常拉取新闻
+        
+        每批发布完成后把成功条数放入 results，供轮询任务调整间隔
+        """
+        loop = asyncio.get_running_loop()
+        while (item := await queue.get()) is not None:
+            if item is _RELEASE_BROWSER:
+                await loop.run_in_executor(None, release_driver, f"连续 {BROWSER_IDLE_POLLS} 次无新内容")
+                continue
+            try:
+                results.put_nowait(await loop.run_in_executor(None, publish_pending, item))
+            finally:
+                # 发布失败的条目移出队列记录，下次轮询时重新入队
+                queued_ids.difference_update(news.get("id") for news in item)
+
+    async def run():
+        # 轮询与发布并行：发布耗时期间继续发现新内容，轮询等待期间也不耽误发布
+        queue: asyncio.Queue = asyncio.Queue()
+        results: asyncio.Queue = asyncio.Queue()
+        queued_ids: set[str] = set()
+        tasks = {
+            asyncio.create_task(poll_news(queue, results, published_ids, queued_ids, stop_event)),
+            asyncio.create_task(publish_worker(queue, results, queued_ids)),
+        }
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                task.result()
+        finally:
+            # 任一任务异常退出时通知另一个任务尽快结束
+            stop_event.set()
+
+    try:
+        asyncio.run(run())
     except KeyboardInterrupt:
         log("exit", "用户手动停止程序")
     except Exception as e:
         err("fatal", traceback.format_exc())
     finally:
-        driver.quit()
+        if driver is not None:
+            driver.quit()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file